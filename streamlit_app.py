@@ -15,90 +15,374 @@ Heuristics:
 - Site name from og:site_name or domain.
 """
 
+import os
 import re
+import sqlite3
+import threading
+import time
 import urllib.parse
-from typing import Dict, List, Optional
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
 
-import requests
+import httpx
+import lxml.etree
+import lxml.html
 import streamlit as st
-from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser, SelectolaxError
+except ImportError:
+    LexborHTMLParser = None
+
+# Pages are already decoded (see _decode_html), so give lxml UTF-8 bytes
+# and let it ignore the <meta charset> or XML encoding declaration
+_LXML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; APA-RIS-Bot/1.0)"
+}
+_TIMEOUT = 15
+
+# Pages fetched in the last day are served from disk; older entries are
+# revalidated with If-None-Match / If-Modified-Since
+_DISK_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "webtoris_cache.sqlite"
+)
+_DISK_CACHE_TTL = 24 * 60 * 60
+_DISK_CACHE_MAX_PAGES = 500
+
+_HEAD_END = b"</head>"
+_MAX_HTML_BYTES = 256 * 1024
+_CHUNK_SIZE = 16 * 1024
+_MAX_DRAIN_BYTES = 64 * 1024
+
+# Matches <meta charset="..."> and <meta http-equiv=... content="...; charset=...">
+_META_CHARSET_RE = re.compile(
+    rb"""<meta[^>]*?charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE
+)
+_CHARSET_SCAN_BYTES = 4 * 1024
+
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+_SPLIT_RE = re.compile(r"[;,]")
+_CORP_RE = re.compile(
+    r"commission|department|council|university|government|ministry|office"
+    r"|organi[sz]ation|authority|association|society|board|institute"
+    r"|foundation|cent(?:re|er)",
+    re.IGNORECASE,
+)
+_NAME_TRANS = str.maketrans({",": " ", ".": " "})
+
+# meta[name] and meta[property] values mapped to their MetaBag field
+_NAME_MAP = {
+    "citation_title": "citation_title",
+    "twitter:title": "twitter_title",
+    "author": "author",
+    "citation_author": "citation_author",
+    "citation_publication_date": "publication_date",
+    "date": "date",
+    "article:published_time": "date",
+}
+_PROP_MAP = {
+    "og:title": "og_title",
+    "article:author": "article_author",
+    "article:published_time": "article_published_time",
+    "og:site_name": "site_name",
+}
+_DATE_FIELDS = {"date", "publication_date", "dc_date", "article_published_time"}
+
+
+@dataclass(slots=True)
+class MetaBag:
+    """First value found for each metadata source on a page."""
+
+    citation_title: str = ""
+    og_title: str = ""
+    twitter_title: str = ""
+    meta_title: str = ""
+    author: str = ""
+    citation_author: List[str] = field(default_factory=list)
+    article_author: str = ""
+    date: str = ""
+    publication_date: str = ""
+    dc_date: str = ""
+    article_published_time: str = ""
+    site_name: str = ""
+
+
+@st.cache_resource
+def get_client() -> httpx.Client:
+    """
+    Shared HTTP/2 client, kept across Streamlit reruns so that connections
+    to a host are reused instead of repeating the TCP and TLS handshakes.
+    """
+    return httpx.Client(
+        http2=True,
+        headers=_HEADERS,
+        timeout=_TIMEOUT,
+        follow_redirects=True,
+    )
+
+
+@st.cache_resource
+def get_disk_cache() -> Tuple[sqlite3.Connection, threading.Lock]:
+    """
+    Open the on-disk page cache once and share it across Streamlit sessions.
+    The lock serialises use of the connection between session threads.
+    """
+    conn = sqlite3.connect(_DISK_CACHE_PATH, timeout=5, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS pages ("
+        "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+        "fetched_at REAL, html TEXT)"
+    )
+    return conn, threading.Lock()
+
+
+def _load_cached_page(url: str) -> Optional[sqlite3.Row]:
+    """Return the on-disk cache entry for a URL, or None if there is none."""
+    try:
+        conn, lock = get_disk_cache()
+        with lock:
+            return conn.execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+    except sqlite3.Error:
+        return None
+
+
+def _store_cached_page(
+    url: str, resp: httpx.Response, cached: Optional[sqlite3.Row], html: str
+) -> None:
+    """
+    Save a fetched page, keeping the old validators if a 304 omitted them.
+    Only the _DISK_CACHE_MAX_PAGES most recently fetched pages are kept.
+    """
+    etag = resp.headers.get("ETag") or (cached["etag"] if cached else None)
+    last_modified = resp.headers.get("Last-Modified") or (
+        cached["last_modified"] if cached else None
+    )
+    try:
+        conn, lock = get_disk_cache()
+        with lock, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, time.time(), html),
+            )
+            conn.execute(
+                "DELETE FROM pages WHERE url NOT IN "
+                "(SELECT url FROM pages ORDER BY fetched_at DESC LIMIT ?)",
+                (_DISK_CACHE_MAX_PAGES,),
+            )
+    except sqlite3.Error:
+        # The disk cache is only an optimisation
+        pass
+
+
+def _revalidation_headers(cached: Optional[sqlite3.Row]) -> Dict[str, str]:
+    """Conditional GET headers for a stale cache entry."""
+    headers: Dict[str, str] = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+    return headers
+
+
+def _is_fresh(cached: Optional[sqlite3.Row]) -> bool:
+    """True if a cache entry is recent enough to use without a request."""
+    return cached is not None and time.time() - cached["fetched_at"] < _DISK_CACHE_TTL
+
+
+def _append_chunk(buf: bytearray, chunk: bytes) -> bool:
+    """Add a chunk to the buffer and return True once enough has been read."""
+    # Back up a few bytes in case the tag is split across chunks
+    start = max(len(buf) - len(_HEAD_END), 0)
+    buf += chunk
+    return _HEAD_END in buf[start:].lower() or len(buf) >= _MAX_HTML_BYTES
+
+
+def _decode_html(buf: bytearray, encoding: Optional[str]) -> str:
+    """
+    Decode the downloaded bytes using the charset from the Content-Type header,
+    else a <meta charset> near the start of the page, else UTF-8, rather than
+    sniffing the whole body.
+    """
+    if not encoding:
+        match = _META_CHARSET_RE.search(buf, 0, _CHARSET_SCAN_BYTES)
+        if match:
+            encoding = match.group(1).decode("ascii")
+    try:
+        return buf.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        # Unknown charset name
+        return buf.decode("utf-8", errors="replace")
+
+
+def _drain_for_reuse(resp: httpx.Response, chunks: Iterator[bytes]) -> None:
+    """
+    Read the rest of a short HTTP/1.1 body so its connection can be reused.
+
+    Stopping at </head> closes the response with the body unread, and httpcore
+    then drops an HTTP/1.1 connection instead of returning it to the pool.
+    When little is left, finishing the read is cheaper than a new handshake;
+    longer or unsized bodies are abandoned. HTTP/2 resets just the stream and
+    keeps the connection, so it never needs this.
+    """
+    if resp.http_version != "HTTP/1.1":
+        return
+    length = resp.headers.get("Content-Length", "")
+    if not length.isdigit() or int(length) - resp.num_bytes_downloaded > _MAX_DRAIN_BYTES:
+        return
+    try:
+        for _ in chunks:
+            pass
+    except httpx.HTTPError:
+        # The page is already read; only the connection is lost
+        pass
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def download_html(url: str) -> str:
+    """
+    Download HTML content from a URL, raising on failure.
+
+    Only the <head> is needed for metadata, so the body is streamed and
+    reading stops once </head> has arrived or _MAX_HTML_BYTES is reached.
+    Results are cached in memory so Streamlit reruns do not fetch the same
+    page again, and on disk so repeat runs can use a conditional GET.
+    """
+    cached = _load_cached_page(url)
+    if _is_fresh(cached):
+        return cached["html"]
+
+    buf = bytearray()
+    headers = _revalidation_headers(cached)
+    with get_client().stream("GET", url, headers=headers) as resp:
+        if resp.status_code == 304 and cached:
+            html = cached["html"]
+        else:
+            resp.raise_for_status()
+            chunks = resp.iter_bytes(_CHUNK_SIZE)
+            for chunk in chunks:
+                if _append_chunk(buf, chunk):
+                    break
+            html = _decode_html(buf, resp.charset_encoding)
+            _drain_for_reuse(resp, chunks)
+    _store_cached_page(url, resp, cached, html)
+    return html
 
 
 def fetch_html(url: str) -> Optional[str]:
     """Fetch HTML content from a URL. Returns text or None on failure."""
+    # Errors are reported here rather than inside the cached download so
+    # that a failed fetch is retried on the next run instead of cached.
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (compatible; APA-RIS-Bot/1.0)"
-        }
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
-        return resp.text
+        return download_html(url)
     except Exception as e:
         st.error(f"Error fetching URL: {e}")
         return None
 
 
-def extract_meta_tags(soup: BeautifulSoup) -> Dict[str, List[str]]:
-    """Collect relevant meta tag values into a simple dictionary."""
-    meta_info: Dict[str, List[str]] = {
-        "citation_title": [],
-        "og_title": [],
-        "twitter_title": [],
-        "meta_title": [],
-        "author": [],
-        "citation_author": [],
-        "article_author": [],
-        "date": [],
-        "publication_date": [],
-        "dc_date": [],
-        "article_published_time": [],
-        "site_name": [],
-    }
+def parse_head(html: str) -> Tuple[Optional[str], List[Mapping[str, Optional[str]]]]:
+    """
+    Parse HTML and return the <title> text and the attributes of each <meta> tag.
 
-    # <title> tag
-    if soup.title and soup.title.string:
-        meta_info["meta_title"].append(soup.title.string.strip())
+    Uses the lexbor parser from selectolax when installed, falling back to
+    an lxml XPath query if it is missing or cannot handle the page.
+    """
+    if LexborHTMLParser is not None:
+        try:
+            tree = LexborHTMLParser(html)
+            title_node = tree.css_first("title")
+            title = title_node.text() if title_node else None
+            return title, [node.attributes for node in tree.css("meta")]
+        except SelectolaxError:
+            # lexbor could not build or query the document; try lxml instead
+            pass
+
+    try:
+        root = lxml.html.fromstring(html.encode("utf-8"), parser=_LXML_PARSER)
+    except lxml.etree.ParserError:
+        # Empty document
+        return None, []
+
+    title: Optional[str] = None
+    meta_tags: List[Mapping[str, Optional[str]]] = []
+    for el in root.xpath("//meta[@content] | //title"):
+        if el.tag == "meta":
+            meta_tags.append(el.attrib)
+        elif title is None:
+            title = el.text
+    return title, meta_tags
 
-    for tag in soup.find_all("meta"):
-        name = (tag.get("name") or "").lower()
-        prop = (tag.get("property") or "").lower()
-        content = tag.get("content") or ""
+
+def extract_meta_tags(html: str) -> MetaBag:
+    """Collect relevant meta tag values into a MetaBag."""
+    meta = MetaBag()
+
+    title, meta_tags = parse_head(html)
+
+    # <title> tag
+    if title and title.strip():
+        meta.meta_title = title.strip()
+
+    # Every tag is scanned: citation_author tags can be interleaved with
+    # other fields, so no earlier point guarantees the author list is complete.
+    for tag in meta_tags:
+        # Check the content first so empty tags skip any name normalisation
+        content = tag.get("content")
+        if not content:
+            continue
         content = content.strip()
         if not content:
             continue
 
-        if name == "citation_title":
-            meta_info["citation_title"].append(content)
-        elif prop == "og:title":
-            meta_info["og_title"].append(content)
-        elif name == "twitter:title":
-            meta_info["twitter_title"].append(content)
-        elif name == "author":
-            meta_info["author"].append(content)
-        elif name == "citation_author":
-            meta_info["citation_author"].append(content)
-        elif prop == "article:author":
-            meta_info["article_author"].append(content)
-        elif name in ["date", "article:published_time"]:
-            meta_info["date"].append(content)
-        elif name == "citation_publication_date":
-            meta_info["publication_date"].append(content)
-        elif name.startswith("dc.date"):
-            meta_info["dc_date"].append(content)
-        elif prop == "article:published_time":
-            meta_info["article_published_time"].append(content)
-        elif prop == "og:site_name":
-            meta_info["site_name"].append(content)
-
-    return meta_info
-
-
-def choose_title(meta: Dict[str, List[str]]) -> Optional[str]:
+        name = tag.get("name")
+        name = name.lower() if name else ""
+        key = _NAME_MAP.get(name)
+        if key is None:
+            prop = tag.get("property")
+            key = _PROP_MAP.get(prop.lower()) if prop else None
+        # Dublin Core dates come in many variants (dc.date.issued, ...);
+        # the first-character test rules out most names before slicing
+        if key is None and name and name[0] == "d" and name[:7] == "dc.date":
+            key = "dc_date"
+        if not key:
+            continue
+
+        if key == "citation_author":
+            # citation_author lists each author separately, so keep them all
+            meta.citation_author.append(content)
+            continue
+        # A date only counts if it contains a year
+        if key in _DATE_FIELDS and not _YEAR_RE.search(content):
+            continue
+        if not getattr(meta, key):
+            setattr(meta, key, content)
+
+    return meta
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_meta_fields(html: str) -> Dict[str, Any]:
+    """
+    MetaBag fields for a page as plain builtins, memoised across reruns.
+
+    Streamlit re-executes the script as a new __main__ module on each rerun,
+    so MetaBag is a different class every time and st.cache_data could fail
+    to pickle it. Only the field values are cached.
+    """
+    return asdict(extract_meta_tags(html))
+
+
+def parse_meta(html: str) -> MetaBag:
+    """Extract a page's metadata, reusing the cached result across reruns."""
+    return MetaBag(**_cached_meta_fields(html))
+
+
+def choose_title(meta: MetaBag) -> Optional[str]:
     """Pick the best available title."""
-    for key in ["citation_title", "og_title", "twitter_title", "meta_title"]:
-        if meta[key]:
-            return meta[key][0]
-    return None
+    return meta.citation_title or meta.og_title or meta.twitter_title or meta.meta_title or None
 
 
 def is_probable_corporate_author(name: str) -> bool:
@@ -106,27 +390,7 @@ def is_probable_corporate_author(name: str) -> bool:
     Simple check to decide if a string is likely a corporate author.
     If it contains common organisational words or has many words, treat as corporate.
     """
-    lower = name.lower()
-    corp_keywords = [
-        "commission",
-        "department",
-        "council",
-        "university",
-        "government",
-        "ministry",
-        "office",
-        "organisation",
-        "organization",
-        "authority",
-        "association",
-        "society",
-        "board",
-        "institute",
-        "foundation",
-        "centre",
-        "center",
-    ]
-    if any(k in lower for k in corp_keywords):
+    if _CORP_RE.search(name):
         return True
 
     # Many words often indicates a corporate body rather than a person
@@ -144,10 +408,11 @@ def format_personal_name(name: str) -> str:
     - "Helen Christensen" -> "Christensen, H."
     - "Helen J. Christensen" -> "Christensen, H. J."
     - "H. Christensen" -> "Christensen, H."
+    - "H.J. Christensen" -> "Christensen, H. J."
     """
     name = name.strip()
-    # Remove extra spaces
-    parts = [p for p in name.replace(",", " ").split() if p]
+    # Commas and full stops both separate tokens, then split drops extra spaces
+    parts = name.translate(_NAME_TRANS).split()
 
     if not parts:
         return name
@@ -158,14 +423,7 @@ def format_personal_name(name: str) -> str:
 
     # Last token as surname
     surname = parts[-1]
-    given_parts = parts[:-1]
-
-    initials: List[str] = []
-    for gp in given_parts:
-        gp_clean = gp.replace(".", "")
-        if not gp_clean:
-            continue
-        initials.append(gp_clean[0].upper() + ".")
+    initials = [p[0].upper() + "." for p in parts[:-1]]
 
     if initials:
         return f"{surname}, {' '.join(initials)}"
@@ -188,13 +446,13 @@ def split_author_string(author_str: str) -> List[str]:
     s = s.replace(" and ", ", ")
 
     # Split on commas and semicolons
-    raw_parts = re.split(r"[;,]", s)
+    raw_parts = _SPLIT_RE.split(s)
     names = [p.strip() for p in raw_parts if p.strip()]
 
     return names if names else [author_str.strip()]
 
 
-def choose_authors(meta: Dict[str, List[str]]) -> List[str]:
+def choose_authors(meta: MetaBag) -> List[str]:
     """
     Pick a list of author strings formatted as:
     - Personal authors: "Surname, F. M."
@@ -203,15 +461,12 @@ def choose_authors(meta: Dict[str, List[str]]) -> List[str]:
     raw_authors: List[str] = []
 
     # citation_author usually lists each author separately
-    if meta["citation_author"]:
-        raw_authors.extend(meta["citation_author"])
-    elif meta["author"]:
-        raw_authors.extend(split_author_string(meta["author"][0]))
-    elif meta["article_author"]:
-        raw_authors.extend(split_author_string(meta["article_author"][0]))
-
-    if not raw_authors:
-        return []
+    if meta.citation_author:
+        raw_authors.extend(meta.citation_author)
+    elif meta.author:
+        raw_authors.extend(split_author_string(meta.author))
+    elif meta.article_author:
+        raw_authors.extend(split_author_string(meta.article_author))
 
     formatted: List[str] = []
     for a in raw_authors:
@@ -223,31 +478,17 @@ def choose_authors(meta: Dict[str, List[str]]) -> List[str]:
     return formatted
 
 
-def extract_year_from_dates(dates: List[str]) -> Optional[str]:
-    """Try to find a four digit year in a list of date strings."""
-    for d in dates:
-        match = re.search(r"\b(19|20)\d{2}\b", d)
-        if match:
-            return match.group(0)
-    return None
-
-
-def choose_year(meta: Dict[str, List[str]]) -> Optional[str]:
+def choose_year(meta: MetaBag) -> Optional[str]:
     """Pick a publication year from the collected meta fields."""
-    candidates: List[str] = []
-    candidates.extend(meta["article_published_time"])
-    candidates.extend(meta["publication_date"])
-    candidates.extend(meta["dc_date"])
-    candidates.extend(meta["date"])
-
-    year = extract_year_from_dates(candidates)
-    return year
+    date = meta.article_published_time or meta.publication_date or meta.dc_date or meta.date
+    match = _YEAR_RE.search(date)
+    return match.group(0) if match else None
 
 
-def choose_site_name(meta: Dict[str, List[str]], url: str) -> str:
+def choose_site_name(meta: MetaBag, url: str) -> str:
     """Pick a site name from og:site_name or fall back to domain."""
-    if meta["site_name"]:
-        return meta["site_name"][0]
+    if meta.site_name:
+        return meta.site_name
     parsed = urllib.parse.urlparse(url)
     host = parsed.netloc
     return host or "Website"
@@ -296,22 +537,18 @@ def build_ris_record(
     UR: url
     N1: full APA-style reference
     """
-    lines: List[str] = []
-    lines.append("TY  - WEB")
-
-    for a in authors:
-        lines.append(f"AU  - {a},")
-
-    if title:
-        lines.append(f"TI  - {title}")
-
-    if year:
-        lines.append(f"PY  - {year}")
-
-    lines.append(f"UR  - {url}")
-    lines.append(f"N1  - {apa_ref}")
-    lines.append("ER  - ")
-
+    lines = filter(
+        None,
+        [
+            "TY  - WEB",
+            *(f"AU  - {a}," for a in authors),
+            f"TI  - {title}" if title else None,
+            f"PY  - {year}" if year else None,
+            f"UR  - {url}",
+            f"N1  - {apa_ref}",
+            "ER  - ",
+        ],
+    )
     return "\n".join(lines) + "\n\n"
 
 
@@ -336,8 +573,7 @@ if st.button("Fetch and generate RIS"):
     else:
         html = fetch_html(url)
         if html:
-            soup = BeautifulSoup(html, "html.parser")
-            meta = extract_meta_tags(soup)
+            meta = parse_meta(html)
 
             title = choose_title(meta)
             authors = choose_authors(meta)